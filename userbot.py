@@ -8,12 +8,14 @@ Userbot - Link-only manager
 - Anti-flood, batching, cooldown, governor caps
 - SESSION_STRING via ENV (ideal untuk Easypanel)
 - Storage pluggable: FILES (default) atau MongoDB (STORAGE=mongo)
+- Shared state (cache/governor/pacing) aman untuk command yang jalan paralel
 """
 
 import os
 import re
 import json
 import time
+import zlib
 import random
 import asyncio
 from typing import Optional, List, Dict, Tuple
@@ -56,15 +58,19 @@ JOIN_DELAY = 70
 BATCH_SIZE = 1
 BATCH_COOLDOWN = 60 * 60
 CHECK_LIMIT = 15
+CHECK_MODE = "auto"          # auto | search | history
+SEARCH_MAX_TARGETS = 5       # auto: pakai search hanya bila target sedikit...
+SEARCH_MIN_LIMIT = 100       # ...dan limit cukup dalam
+CHECK_BASE_INTERVAL = 60 * 60        # backoff pertama untuk channel sepi / error
+CHECK_MAX_INTERVAL = 7 * 24 * 60 * 60
+CHECK_ACTIVE_RATE = 1.0              # pesan/jam; di atas ini channel dianggap aktif
+CHECK_MATCH_GRACE = 24 * 60 * 60     # channel yang baru match tetap dicek rapat
 STATUS_INTERVAL = 5
 HOURLY_JOIN_CAP = 11
 DAILY_JOIN_CAP = 15
 FLOOD_ABORT_SECONDS = 600
 MAX_AUTOVERIFY_PER_ADD = 11
 
-adaptive_delay = JOIN_DELAY
-join_timestamps = deque(maxlen=DAILY_JOIN_CAP * 2)
-
 # ==================== STORAGE LAYER (FILES / MONGO) ====================
 def _load_lines_file(path):
     if not os.path.exists(path): return []
@@ -85,14 +91,16 @@ def _load_cache_file():
         return {}
 
 def _save_cache_file(cache: dict):
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+    tmp = CACHE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, CACHE_FILE)
 
 # --- Mongo backend (opsional) ---
 _mongo_enabled = False
 if STORAGE == "mongo":
     try:
-        from pymongo import MongoClient, ASCENDING
+        from pymongo import MongoClient, ASCENDING, UpdateOne
         MONGO_URI = os.getenv("MONGO_URI")
         MONGO_DB  = os.getenv("MONGO_DB", "userbot")
         if not MONGO_URI:
@@ -132,10 +140,6 @@ def _load_cache_mongo():
         out[d["key"]] = d["value"]
     return out
 
-def _save_cache_mongo(cache: dict):
-    for k, v in cache.items():
-        col_cache.update_one({"key": k}, {"$set": {"value": v}}, upsert=True)
-
 # --- Public API dipakai seluruh kode ---
 def load_lines(kind_path: str) -> List[str]:
     if STORAGE == "mongo" and _mongo_enabled:
@@ -161,10 +165,145 @@ def load_cache() -> Dict[str, dict]:
     if STORAGE == "mongo" and _mongo_enabled: return _load_cache_mongo()
     return _load_cache_file()
 
-def save_cache(cache: Dict[str, dict]):
-    if STORAGE == "mongo" and _mongo_enabled: return _save_cache_mongo(cache)
+def save_cache_entries(entries: Dict[str, dict], cache: Dict[str, dict]):
+    """Persist beberapa key sekaligus. Mongo: satu bulk upsert; files: satu kali tulis seluruh `cache`."""
+    if not entries: return
+    if STORAGE == "mongo" and _mongo_enabled:
+        return col_cache.bulk_write(
+            [UpdateOne({"key": k}, {"$set": {"value": v}}, upsert=True) for k, v in entries.items()]
+        )
     return _save_cache_file(cache)
 
+def save_cache_entry(key: str, value: dict, cache: Dict[str, dict]):
+    return save_cache_entries({key: value}, cache)
+
+# ==================== SHARED STATE ====================
+class SharedState:
+    """
+    Pemilik tunggal cache, governor & pacing di proses ini, supaya beberapa command
+    (mis. /join dan /check) bisa jalan paralel tanpa saling timpa.
+    - cache: satu dict bersama; tulis lewat cache_update() (merge per-key + persist)
+    - key_lock(key): serialisasi kerja untuk satu channel/link
+    - reserve_join()/release_join(): cek quota + catat join dalam satu langkah atomik
+    - snapshot(): salinan konsisten untuk laporan
+    Semua method sync tidak punya `await` di tengah, jadi atomik terhadap coroutine lain.
+    """
+
+    def __init__(self):
+        self.adaptive_delay = JOIN_DELAY
+        self.join_timestamps = deque(maxlen=DAILY_JOIN_CAP * 2)
+        self.flood_history = deque(maxlen=50)  # (timestamp, detik) FloodWait yang pernah diterima
+        self._cache: Optional[Dict[str, dict]] = None
+        self._cache_lock = asyncio.Lock()
+        self._key_locks: Dict[str, asyncio.Lock] = {}
+
+    # --- cache ---
+    @property
+    def cache(self) -> Dict[str, dict]:
+        if self._cache is None: self._cache = load_cache()
+        return self._cache
+
+    def cache_get(self, key: str) -> Optional[dict]:
+        v = self.cache.get(key)
+        return dict(v) if v else None
+
+    def cache_snapshot(self) -> Dict[str, dict]:
+        return {k: dict(v) for k, v in self.cache.items()}
+
+    async def cache_update(self, key: str, **fields) -> dict:
+        async with self._cache_lock:
+            entry = dict(self.cache.get(key) or {})
+            entry.update(fields)
+            self.cache[key] = entry
+            # entry selalu diganti (tidak dimutasi), jadi shallow copy aman dipakai di thread
+            await asyncio.to_thread(save_cache_entry, key, entry, dict(self.cache))
+            return dict(entry)
+
+    async def cache_update_many(self, updates: Dict[str, dict]):
+        """Seperti cache_update untuk banyak key ({key: fields}), tapi persist sekali saja."""
+        if not updates: return
+        async with self._cache_lock:
+            changed = {}
+            for key, fields in updates.items():
+                entry = dict(self.cache.get(key) or {})
+                entry.update(fields)
+                self.cache[key] = changed[key] = entry
+            await asyncio.to_thread(save_cache_entries, changed, dict(self.cache))
+
+    def key_lock(self, key: str) -> asyncio.Lock:
+        return self._key_locks.setdefault(key, asyncio.Lock())
+
+    # --- governor ---
+    def prune(self):
+        now = time.time()
+        while self.join_timestamps and now - self.join_timestamps[0] > 24*3600:
+            self.join_timestamps.popleft()
+
+    def join_stamps(self) -> List[float]:
+        self.prune()
+        return list(self.join_timestamps)
+
+    def quota(self) -> Tuple[bool, str]:
+        self.prune()
+        now = time.time()
+        last_hour = [t for t in self.join_timestamps if now - t <= 3600]
+        if len(last_hour) >= HOURLY_JOIN_CAP: return False, "hour"
+        if len(self.join_timestamps) >= DAILY_JOIN_CAP: return False, "day"
+        return True, ""
+
+    def reserve_join(self) -> Tuple[Optional[float], str]:
+        ok, window = self.quota()
+        if not ok: return None, window
+        ts = time.time()
+        self.join_timestamps.append(ts)
+        return ts, ""
+
+    def release_join(self, ts: Optional[float]):
+        if ts is None: return
+        try:
+            self.join_timestamps.remove(ts)
+        except ValueError:
+            pass
+
+    def note_flood(self, seconds: int):
+        self.flood_history.append((time.time(), int(seconds)))
+
+    def recent_floods(self) -> List[Tuple[float, int]]:
+        now = time.time()
+        return [f for f in self.flood_history if now - f[0] <= 24*3600]
+
+    def set_caps(self, hourly: int, daily: int):
+        global HOURLY_JOIN_CAP, DAILY_JOIN_CAP
+        HOURLY_JOIN_CAP, DAILY_JOIN_CAP = hourly, daily
+        # riwayat join tetap dibawa, jadi ganti cap di tengah run tidak me-reset quota
+        self.join_timestamps = deque(self.join_timestamps, maxlen=max(daily * 2, 1))
+
+    # --- pacing ---
+    def reset_delay(self, base: float):
+        self.adaptive_delay = base
+
+    def raise_delay(self, floor: float):
+        self.adaptive_delay = max(self.adaptive_delay, floor)
+
+    def step_delay(self):
+        self.adaptive_delay = min(max(self.adaptive_delay, JOIN_DELAY) + 1, 20)
+
+    def snapshot(self) -> dict:
+        stamps = self.join_stamps()
+        now = time.time()
+        return {
+            "joins_hour": sum(1 for t in stamps if now - t <= 3600),
+            "joins_day": len(stamps),
+            "hourly_cap": HOURLY_JOIN_CAP,
+            "daily_cap": DAILY_JOIN_CAP,
+            "adaptive_delay": self.adaptive_delay,
+            "floods_24h": len(self.recent_floods()),
+            "cache_size": len(self.cache),
+            "locks_busy": sum(1 for lk in self._key_locks.values() if lk.locked()),
+        }
+
+state = SharedState()
+
 # ==================== LINK & MESSAGE PARSING ====================
 TME_ANY_RE   = re.compile(r"(?:https?://)?t\.me/.+", re.IGNORECASE)
 INV_PLUS_RE  = re.compile(r"^(?:https?://)?t\.me/\+([A-Za-z0-9_-]+)$", re.IGNORECASE)
@@ -260,8 +399,7 @@ def get_all_tme_links(msg) -> List[str]:
 
 # ==================== DELAY / STATUS / GOVERNOR ====================
 async def human_sleep(base: Optional[float] = None):
-    global adaptive_delay
-    base = base or adaptive_delay
+    base = base or state.adaptive_delay
     jitter = base * random.uniform(0.2, 0.4)
     await asyncio.sleep(base + jitter)
 
@@ -274,18 +412,110 @@ async def update_status(msg, text: str):
         except Exception:
             pass
 
-def _prune_old():
-    now = time.time()
-    while join_timestamps and now - join_timestamps[0] > 24*3600:
-        join_timestamps.popleft()
-
 def quota_allows_join() -> Tuple[bool, str]:
-    _prune_old()
-    now = time.time()
-    last_hour = [t for t in join_timestamps if now - t <= 3600]
-    if len(last_hour) >= HOURLY_JOIN_CAP: return False, "hour"
-    if len(join_timestamps) >= DAILY_JOIN_CAP: return False, "day"
-    return True, ""
+    return state.quota()
+
+def note_flood(seconds: int):
+    state.note_flood(seconds)
+
+# ==================== JOIN PLANNER (VIRTUAL CLOCK) ====================
+def _next_join_slot(t: float, stamps: List[float]) -> Tuple[float, str]:
+    """Waktu paling awal >= t yang lolos cap. window: "" (langsung), "hour" (harus tunggu), "day" (stop)."""
+    if HOURLY_JOIN_CAP <= 0 or DAILY_JOIN_CAP <= 0: return t, "day"
+    waited = ""
+    while True:
+        last_day = sorted(s for s in stamps if t - s <= 24*3600)
+        if len(last_day) >= DAILY_JOIN_CAP: return t, "day"
+        last_hour = [s for s in last_day if t - s <= 3600]
+        if len(last_hour) < HOURLY_JOIN_CAP: return t, waited
+        t = last_hour[-HOURLY_JOIN_CAP] + 3600 + 1
+        waited = "hour"
+
+def _join_key(kind: str, val: str) -> str:
+    return normalize_tme_link(val if kind == "invite" else f"https://t.me/{val}")
+
+def _initial_join_delay(floods) -> float:
+    worst = max((v for _, v in floods), default=0)
+    delay = JOIN_DELAY
+    if worst >= 300: delay = max(delay, 15)
+    if worst >= 1200: delay = max(delay, 20)
+    return delay
+
+def _flood_resume_at(now: float, floods) -> float:
+    """Join berikutnya baru boleh setelah semua jendela FloodWait terakhir lewat (+10s)."""
+    return max([now] + [ts + v + 10 for ts, v in floods])
+
+def plan_join(work_items: List[Tuple[str, str]], cache: Dict[str, dict], needed: List[str] = (),
+              now: Optional[float] = None, stamps=None, floods=None, force: bool = False) -> dict:
+    """
+    Susun jadwal /join tanpa sleep & tanpa network:
+    - channel yang dipakai /check (needed) didahulukan
+    - yang sudah punya chat_id di cache di-skip (kecuali force: cache bisa basi setelah leave/kick)
+    - pacing sama dengan join_cmd: delay adaptif + jitter rata-rata, BATCH_SIZE/BATCH_COOLDOWN,
+      cap hourly/daily, dan jeda FloodWait terakhir
+    """
+    now = time.time() if now is None else now
+    stamps = [s for s in (state.join_stamps() if stamps is None else stamps) if now - s <= 24*3600]
+    floods = [f for f in (state.recent_floods() if floods is None else floods) if now - f[0] <= 24*3600]
+    needed = {normalize_tme_link(x) for x in needed}
+
+    todo, skipped, seen = [], [], set()
+    for kind, val in work_items:
+        key = _join_key(kind, val)
+        if key in seen: continue
+        seen.add(key)
+        cached = cache.get(key)
+        if cached and "chat_id" in cached and not force:
+            skipped.append((kind, val)); continue
+        todo.append((key not in needed, kind, val))
+    todo.sort(key=lambda x: x[0])  # sort stabil: needed duluan, sisanya urutan input
+
+    t = _flood_resume_at(now, floods)
+    delay = _initial_join_delay(floods)
+    schedule, deferred, in_batch = [], [], 0
+    for i, (_, kind, val) in enumerate(todo):
+        slot, window = _next_join_slot(t, stamps)
+        if window == "day":
+            deferred = [(k, v) for _, k, v in todo[i:]]; break
+        schedule.append({"kind": kind, "val": val, "at": slot, "wait": window})
+        stamps.append(slot)
+        delay = min(max(delay, JOIN_DELAY) + 1, 20)
+        in_batch += 1
+        if in_batch >= BATCH_SIZE:
+            t = slot + BATCH_COOLDOWN; in_batch = 0
+        else:
+            t = slot + delay * 1.3
+    eta = schedule[-1]["at"] if schedule else now
+    return {"now": now, "schedule": schedule, "skipped": skipped, "deferred": deferred, "eta": eta}
+
+def fmt_dur(sec: float) -> str:
+    sec = int(max(0, sec))
+    h, rem = divmod(sec, 3600); m, s = divmod(rem, 60)
+    if h: return f"{h}h {m:02d}m"
+    if m: return f"{m}m {s:02d}s"
+    return f"{s}s"
+
+def _label(kind: str, val: str) -> str:
+    return val if kind == "invite" else "@" + val
+
+def format_join_plan(plan: dict) -> str:
+    now = plan["now"]
+    text = (
+        "🧪 **Rencana /join** (virtual clock)\n"
+        f"Dijadwalkan: {len(plan['schedule'])} | Skip (cache): {len(plan['skipped'])} | "
+        f"Ditunda (cap harian): {len(plan['deferred'])}\n"
+        f"⏱ ETA selesai: +{fmt_dur(plan['eta'] - now)} ({time.strftime('%d/%m %H:%M', time.localtime(plan['eta']))})\n"
+    )
+    if plan["schedule"]:
+        text += "\n**Jadwal:**\n" + "\n".join(
+            f"+{fmt_dur(x['at'] - now)}  {_label(x['kind'], x['val'])}" + ("  (tunggu cap hour)" if x["wait"] else "")
+            for x in plan["schedule"][:30]
+        )
+    if plan["skipped"]:
+        text += "\n\n**Skip (sudah di cache):**\n" + "\n".join(_label(k, v) for k, v in plan["skipped"][:30])
+    if plan["deferred"]:
+        text += "\n\n**Ditunda (cap harian):**\n" + "\n".join(_label(k, v) for k, v in plan["deferred"][:30])
+    return text
 
 # ==================== CLIENT INIT (SESSION_STRING) ====================
 if SESSION_STRING:
@@ -319,34 +549,51 @@ async def whoami_cmd(client: Client, msg: Message):
         f"- storage: `{STORAGE}`"
     )
 
+@app.on_message(filters.me & filters.command("status", prefixes="/"))
+async def status_cmd(_, msg: Message):
+    snap = state.snapshot()
+    await msg.reply_text(
+        f"📊 **State**\n"
+        f"- join 1 jam: {snap['joins_hour']}/{snap['hourly_cap']}\n"
+        f"- join 24 jam: {snap['joins_day']}/{snap['daily_cap']}\n"
+        f"- delay adaptif: ~{int(snap['adaptive_delay'])}s\n"
+        f"- FloodWait 24 jam: {snap['floods_24h']}\n"
+        f"- cache: {snap['cache_size']} chat | lock aktif: {snap['locks_busy']}"
+    )
+
 @app.on_message(filters.me & filters.command("help", prefixes="/"))
 async def help_cmd(_, msg: Message):
     text = (
         "**Perintah (Auto-Verify & Anti-Flood):**\n\n"
         "🧩 Join (undangan & publik)\n"
-        "  `/join <multi-link atau @user>` — satu per baris\n\n"
+        "  `/join <multi-link atau @user>` — satu per baris\n"
+        "  `/join --dry-run <multi-link>` — lihat jadwal & ETA tanpa join\n"
+        "  `/join --force <multi-link>` — join ulang walau sudah ada di cache\n\n"
         "🔗 Target Pencarian\n"
         "  `/addlist <link t.me atau keyword>`\n  `/dellist [item]`\n  `/showlist`\n\n"
         "📺 Channel (t.me)\n"
         "  `/addchan <multi-link>` — auto-fix & auto-verify (maks terbatas)\n"
         "  `/delchan [link]`\n  `/showchan`\n  `/verifychan`\n\n"
         "🔍 Cek\n"
-        "  `/check [limit]` — default 30 pesan per channel\n\n"
+        "  `/check [limit] [auto|search|history] [force]` — default 30 pesan per channel\n"
+        "  channel sepi/error dijadwal ulang otomatis; `force` = cek semua\n"
+        "  search = cari di server saja (cepat, tapi bisa lewatkan link di tombol)\n"
+        "  auto = search untuk target keyword/@user, history untuk target link\n\n"
         "⚙️ Setting runtime\n"
         "  `/setdelay <detik>`  `/setbatch <jumlah>`  `/setcooldown <menit>`\n"
         "  `/setcaps <hourly> <daily>`\n"
         "🧪 Debug\n"
-        "  `/ping`  `/whoami`\n"
+        "  `/ping`  `/whoami`  `/status`\n"
     )
     await msg.reply_text(text, disable_web_page_preview=True)
 
 @app.on_message(filters.me & filters.command("setdelay", prefixes="/"))
 async def setdelay_cmd(_, msg: Message):
-    global JOIN_DELAY, adaptive_delay
+    global JOIN_DELAY
     parts = msg.text.split(maxsplit=1)
     if len(parts) < 2 or not parts[1].isdigit():
         await msg.reply_text("Format: `/setdelay <detik>`"); return
-    JOIN_DELAY = int(parts[1]); adaptive_delay = JOIN_DELAY
+    JOIN_DELAY = int(parts[1]); state.reset_delay(JOIN_DELAY)
     await msg.reply_text(f"✅ JOIN_DELAY diset ke **{JOIN_DELAY}s** (adaptive reset).")
 
 @app.on_message(filters.me & filters.command("setbatch", prefixes="/"))
@@ -369,12 +616,10 @@ async def setcooldown_cmd(_, msg: Message):
 
 @app.on_message(filters.me & filters.command("setcaps", prefixes="/"))
 async def setcaps_cmd(_, msg: Message):
-    global HOURLY_JOIN_CAP, DAILY_JOIN_CAP, join_timestamps
     parts = msg.text.split()
     if len(parts) != 3 or not parts[1].isdigit() or not parts[2].isdigit():
         await msg.reply_text("Format: `/setcaps <hourly> <daily>`"); return
-    HOURLY_JOIN_CAP = int(parts[1]); DAILY_JOIN_CAP = int(parts[2])
-    join_timestamps = deque(maxlen=DAILY_JOIN_CAP * 2)
+    state.set_caps(int(parts[1]), int(parts[2]))
     await msg.reply_text(f"✅ Caps diset ke hourly={HOURLY_JOIN_CAP}, daily={DAILY_JOIN_CAP}.")
 
 # ----- LIST MANAGEMENT -----
@@ -455,8 +700,6 @@ async def showchan_cmd(_, msg: Message):
 
 # ----- VERIFY CORE -----
 async def verify_links(client: Client, links: List[str], parent_msg: Message):
-    global adaptive_delay
-    cache = load_cache()
     status = await parent_msg.reply_text("🔍 Memverifikasi channel…")
     ok, bad = [], []
     total = len(links)
@@ -465,32 +708,34 @@ async def verify_links(client: Client, links: List[str], parent_msg: Message):
         link_n = normalize_tme_link(link)
         try:
             target = None
-            cached = cache.get(link_n)
-            if cached and "chat_id" in cached:
-                target = int(cached["chat_id"])
-            else:
-                uname = extract_public_username(link_n)
-                if uname:
-                    target = uname
-                elif is_invite_link(link_n):
-                    ok_quota, w = quota_allows_join()
-                    if not ok_quota:
-                        bad.append(f"{link_n} → quota {w} reached (skipped)")
-                    else:
-                        try:
-                            chat = await client.join_chat(link_n)
-                            cache[link_n] = {"chat_id": chat.id, "title": chat.title or ""}
-                            save_cache(cache)
-                            target = chat.id
-                            join_timestamps.append(time.time())
-                        except UserAlreadyParticipant:
+            async with state.key_lock(link_n):
+                cached = state.cache_get(link_n)
+                if cached and "chat_id" in cached:
+                    target = int(cached["chat_id"])
+                else:
+                    uname = extract_public_username(link_n)
+                    if uname:
+                        target = uname
+                    elif is_invite_link(link_n):
+                        ts, w = state.reserve_join()
+                        if ts is None:
+                            bad.append(f"{link_n} → quota {w} reached (skipped)")
+                        else:
                             try:
-                                ch = await client.get_chat(link_n)
-                                cache[link_n] = {"chat_id": ch.id, "title": ch.title or ""}
-                                save_cache(cache)
-                                target = ch.id
+                                chat = await client.join_chat(link_n)
+                                await state.cache_update(link_n, chat_id=chat.id, title=chat.title or "")
+                                target = chat.id
+                            except UserAlreadyParticipant:
+                                state.release_join(ts)
+                                try:
+                                    ch = await client.get_chat(link_n)
+                                    await state.cache_update(link_n, chat_id=ch.id, title=ch.title or "")
+                                    target = ch.id
+                                except Exception:
+                                    pass
                             except Exception:
-                                pass
+                                state.release_join(ts)
+                                raise
 
             if not target:
                 bad.append(f"{link_n} → cannot resolve (skip)")
@@ -503,8 +748,9 @@ async def verify_links(client: Client, links: List[str], parent_msg: Message):
         except InviteHashExpired:
             bad.append(f"{link_n} → INVITE EXPIRED")
         except FloodWait as e:
-            if e.value >= 300: adaptive_delay = max(adaptive_delay, 15)
-            if e.value >= 1200: adaptive_delay = max(adaptive_delay, 20)
+            note_flood(e.value)
+            if e.value >= 300: state.raise_delay(15)
+            if e.value >= 1200: state.raise_delay(20)
             bad.append(f"{link_n} → FloodWait {e.value}s (skipped)")
             await asyncio.sleep(min(e.value + 10, 60 * 60))
         except Exception as e:
@@ -528,14 +774,20 @@ async def verifychan_cmd(client: Client, msg: Message):
     await verify_links(client, chans, msg)
 
 # ----- JOIN -----
+JOIN_FLAG_RE = re.compile(r"(--[a-z-]+)\s*")
+
 @app.on_message(filters.me & filters.command("join", prefixes="/"))
 async def join_cmd(client: Client, msg: Message):
-    global adaptive_delay
     raw = msg.text.split(maxsplit=1)
-    if len(raw) < 2:
-        await msg.reply_text("Gunakan: `/join <multi-link or @user or username>` (satu per baris)."); return
-
-    items = [x.strip() for x in raw[1].splitlines() if x.strip()]
+    body = raw[1].strip() if len(raw) == 2 else ""
+    flags = set()
+    while (m := JOIN_FLAG_RE.match(body)):
+        flags.add(m.group(1)); body = body[m.end():]
+    dry_run, force = "--dry-run" in flags, "--force" in flags
+    if not body:
+        await msg.reply_text("Gunakan: `/join [--dry-run] [--force] <multi-link or @user or username>` (satu per baris)."); return
+
+    items = [x.strip() for x in body.splitlines() if x.strip()]
     normalized = [normalize_tme_link(x) for x in items]
     invite_links = [ln for ln in normalized if is_invite_link(ln)]
     public_users = [extract_public_username(ln) for ln in normalized if extract_public_username(ln)]
@@ -544,65 +796,92 @@ async def join_cmd(client: Client, msg: Message):
     if not work_items:
         await msg.reply_text("❌ Tidak ada link undangan atau username publik yang valid."); return
 
-    status = await msg.reply_text("🚪 Memulai proses join…")
-    cache = load_cache()
+    plan = plan_join(work_items, state.cache_snapshot(), needed=load_lines(CHANNEL_FILE), force=force)
+    if dry_run:
+        await msg.reply_text(format_join_plan(plan), disable_web_page_preview=True); return
+
+    status = await msg.reply_text(f"🚪 Memulai proses join… ETA ~{fmt_dur(plan['eta'] - plan['now'])}")
     success, failed = [], []
-    adaptive_delay = JOIN_DELAY
+    cached_skip = [_label(k, v) for k, v in plan["skipped"]]
+    queue = [(x["kind"], x["val"]) for x in plan["schedule"]] + plan["deferred"]
+    floods = state.recent_floods()
+    state.raise_delay(_initial_join_delay(floods))  # jangan turunkan delay yang dinaikkan command lain
+    resume_at = _flood_resume_at(time.time(), floods)
+    if resume_at > time.time():
+        wait = resume_at - time.time()
+        await update_status(status, f"⏳ Menunggu jendela FloodWait terakhir selesai ({fmt_dur(wait)})...")
+        await asyncio.sleep(wait)
     count_in_batch = 0
-    total = len(work_items)
-
-    for idx, (kind, val) in enumerate(work_items, start=1):
+    total = len(queue)
+
+    for idx, (kind, val) in enumerate(queue, start=1):
+        ts = None
+        key = _join_key(kind, val)
+        # skip cache tidak boleh makan slot quota, menunggu cap hourly, atau memicu cooldown batch
+        async with state.key_lock(key):
+            cached = state.cache_get(key)
+        if cached and "chat_id" in cached and not force:
+            cached_skip.append(_label(kind, val)); continue
         try:
-            ok_quota, window = quota_allows_join()
-            if not ok_quota:
-                if window == "hour":
-                    await update_status(status, "⛔ Hourly cap reached. Cooling down 60 minutes...")
-                    await asyncio.sleep(max(BATCH_COOLDOWN, 60 * 60))
+            # slot bisa direbut command lain yang jalan paralel -> ulangi sampai reserve berhasil
+            while ts is None:
+                now = time.time()
+                slot, window = _next_join_slot(now, state.join_stamps())
+                if window == "day": break
+                if slot > now:
+                    await update_status(status, f"⛔ Hourly cap reached. Menunggu slot berikutnya ({fmt_dur(slot - now)})...")
+                    await asyncio.sleep(slot - now)
+                ts, window = state.reserve_join()
+            if ts is None:
+                await update_status(status, "⛔ Daily cap reached. Stopping join.")
+                failed += [f"{_label(k, v)} → ditunda (cap harian)" for k, v in queue[idx-1:]]
+                break
+
+            async with state.key_lock(key):
+                cached = state.cache_get(key)
+                if cached and "chat_id" in cached and not force:
+                    # di-join command lain selama menunggu slot
+                    state.release_join(ts)
+                    cached_skip.append(_label(kind, val)); continue
+                if kind == "invite":
+                    chat = await client.join_chat(val)
+                    await state.cache_update(key, chat_id=chat.id, title=chat.title or "")
+                    success.append(chat.title or val)
                 else:
-                    await update_status(status, "⛔ Daily cap reached. Stopping join.")
-                    break
-
-            if kind == "invite":
-                chat = await client.join_chat(val)
-                cache[normalize_tme_link(val)] = {"chat_id": chat.id, "title": chat.title or ""}
-                save_cache(cache)
-                success.append(chat.title or val)
-                join_timestamps.append(time.time())
-            else:
-                username = val
-                try:
-                    chat = await client.join_chat(username)
-                    cache_key = normalize_tme_link(f"https://t.me/{username}")
-                    cache[cache_key] = {"chat_id": chat.id, "title": chat.title or ""}
-                    save_cache(cache)
-                    success.append(chat.title or "@" + username)
-                    join_timestamps.append(time.time())
-                except UserAlreadyParticipant:
-                    success.append(f"(sudah join) @{username}")
-                    join_timestamps.append(time.time())
-
-            adaptive_delay = min(max(adaptive_delay, JOIN_DELAY) + 1, 20)
+                    username = val
+                    try:
+                        chat = await client.join_chat(username)
+                        await state.cache_update(key, chat_id=chat.id, title=chat.title or "")
+                        success.append(chat.title or "@" + username)
+                    except UserAlreadyParticipant:
+                        success.append(f"(sudah join) @{username}")
+
+            state.step_delay()
 
         except UserAlreadyParticipant:
             success.append(f"(sudah join) {val}")
-            join_timestamps.append(time.time())
         except InviteHashInvalid:
+            state.release_join(ts)
             failed.append(f"{val} → INVALID")
         except InviteHashExpired:
+            state.release_join(ts)
             failed.append(f"{val} → EXPIRED")
         except FloodWait as e:
+            state.release_join(ts)
+            note_flood(e.value)
             if e.value >= FLOOD_ABORT_SECONDS:
-                adaptive_delay = max(adaptive_delay, 20)
+                state.raise_delay(20)
                 await update_status(status, f"⛔ FloodWait {e.value}s (>= abort threshold). Long cooldown 60 minutes.")
                 await asyncio.sleep(60 * 60)
                 failed.append(f"{val} → FloodWait {e.value}s (abort)")
                 break
             else:
-                if e.value >= 300: adaptive_delay = max(adaptive_delay, 15)
+                if e.value >= 300: state.raise_delay(15)
                 await update_status(status, f"⛔ FloodWait {e.value}s (pausing)...")
                 await asyncio.sleep(e.value + 10)
                 failed.append(f"{val} → FloodWait {e.value}s (skipped)")
         except Exception as e:
+            state.release_join(ts)
             failed.append(f"{val} → {e}")
 
         count_in_batch += 1
@@ -616,21 +895,25 @@ async def join_cmd(client: Client, msg: Message):
                 await human_sleep()
 
         if idx % STATUS_INTERVAL == 0 or idx == total:
-            await update_status(status, f"🚪 Join progres: {idx}/{total}\n✔️ Sukses: {len(success)} | ⚠️ Gagal: {len(failed)}\n⏱ Delay adaptif: ~{int(adaptive_delay)}s")
+            await update_status(status, f"🚪 Join progres: {idx}/{total}\n✔️ Sukses: {len(success)} | ⚠️ Gagal: {len(failed)}\n⏱ Delay adaptif: ~{int(state.adaptive_delay)}s")
 
     report = "✅ **Join selesai!**\n"
-    report += f"Total attempt: {total} | ✔️ {len(success)} | ⚠️ {len(failed)}\n"
+    report += (f"Total: {total + len(plan['skipped'])} | ✔️ {len(success)} | ⚠️ {len(failed)} | "
+               f"⏭ Skip (cache): {len(cached_skip)}\n")
     if success: report += "\n**Sukses (sample):**\n" + "\n".join(success[:30])
+    if cached_skip: report += "\n\n**Skip (sudah di cache, pakai --force untuk join ulang):**\n" + "\n".join(cached_skip[:30])
     if failed:  report += "\n\n**Gagal/Skip (sample):**\n" + "\n".join(failed[:30])
     await update_status(status, report)
 
 # ----- CHECK -----
 @app.on_message(filters.me & filters.command("check", prefixes="/"))
 async def check_cmd(client: Client, msg: Message):
-    parts = msg.text.split(maxsplit=1)
-    limit = CHECK_LIMIT
-    if len(parts) == 2 and parts[1].isdigit():
-        limit = max(10, min(1000, int(parts[1])))
+    parts = msg.text.split()[1:]
+    limit, mode, force = CHECK_LIMIT, CHECK_MODE, False
+    for p in parts:
+        if p.isdigit(): limit = max(10, min(1000, int(p)))
+        elif p.lower() in ("auto", "search", "history"): mode = p.lower()
+        elif p.lower() == "force": force = True
 
     chans = load_lines(CHANNEL_FILE)
     targets = load_lines(LINK_FILE)
@@ -639,97 +922,273 @@ async def check_cmd(client: Client, msg: Message):
     if not targets:
         await msg.reply_text("⚠️ Tidak ada target pencarian. Tambahkan dulu pakai `/addlist`."); return
 
-    status = await msg.reply_text(f"🔎 Memulai pengecekan (limit {limit} per channel)...")
-    cache = load_cache()
+    status = await msg.reply_text(f"🔎 Memulai pengecekan (limit {limit} per channel, mode {mode})...")
     total = len(chans)
-    found, processed = 0, 0
-    lines = []
+    found, found_prev, processed = 0, 0, 0
+    lines, skipped = [], []
+    used = {"search": 0, "history": 0, "idle": 0}
+    sig = targets_sig(targets)
+    pending = {}  # stats per channel, di-persist per STATUS_INTERVAL (bukan tulis cache tiap channel)
 
     for i, link in enumerate(chans, start=1):
         link_n = normalize_tme_link(link)
-        try:
-            if is_invite_link(link_n):
-                ok_quota, win = quota_allows_join()
-                if ok_quota:
-                    await ensure_join_if_needed(client, link_n, cache)
-                else:
-                    lines.append(f"{link_n}: ⚠️ quota {win} reached (skip join invite).")
-
-            target = None
-            cached = cache.get(link_n)
-            if cached and "chat_id" in cached:
-                target = int(cached["chat_id"])
-            else:
-                uname = extract_public_username(link_n)
-                if uname: target = uname
-
-            if target is None:
-                lines.append(f"{link_n}: ⚠️ Tidak bisa diakses (undangan belum ter-cache). Jalankan /verifychan.")
-                processed += 1
-                continue
-
-            chat = await client.get_chat(target)
-
-            ok = False
-            async for m in client.get_chat_history(chat.id, limit=limit):
-                all_tlinks = get_all_tme_links(m)
-                for tgt in targets:
-                    tgt_low = tgt.lower()
-                    if tgt_low.startswith("http"):
-                        if any(tgt_low in tl.lower() for tl in all_tlinks):
-                            ok = True; break
+        stats = (state.cache_get(link_n) or {}).get("stats")
+        due, why = (True, "") if force else check_due(stats, sig, time.time())
+        scanned = False
+        if not due:
+            skipped.append(f"{link_n}: ⏭ {why} (terakhir: {'YES' if stats.get('matched') else 'NO'})")
+            if stats.get("matched"): found_prev += 1
+        else:
+            try:
+                if is_invite_link(link_n):
+                    ok_quota, win = quota_allows_join()
+                    if ok_quota:
+                        await ensure_join_if_needed(client, link_n)
                     else:
-                        hay = (m.text or "") + "\n" + (m.caption or "")
-                        if tgt_low in hay.lower() or any(tgt_low in tl.lower() for tl in all_tlinks):
-                            ok = True; break
-                if ok: break
+                        lines.append(f"{link_n}: ⚠️ quota {win} reached (skip join invite).")
 
-            lines.append(f"{chat.title or link_n}: {'✅ YES' if ok else '❌ NO'}")
-            if ok: found += 1
-            processed += 1
+                target = None
+                cached = state.cache_get(link_n)
+                if cached and "chat_id" in cached:
+                    target = int(cached["chat_id"])
+                else:
+                    uname = extract_public_username(link_n)
+                    if uname: target = uname
 
-        except FloodWait as e:
-            lines.append(f"{link_n}: ⏳ FloodWait {e.value}s (skipped temporarily)")
-            await asyncio.sleep(min(e.value + 5, 60 * 60))
-        except Exception as e:
-            lines.append(f"{link_n}: ⚠️ {e}")
-            processed += 1
+                if target is None:
+                    lines.append(f"{link_n}: ⚠️ Tidak bisa diakses (undangan belum ter-cache). Jalankan /verifychan.")
+                    processed += 1
+                    pending[link_n] = {"stats": next_check_stats(stats, time.time(), sig, error=True)}
+                else:
+                    chat = await client.get_chat(target)
+                    top = await latest_message(client, chat.id)
+                    top_id = top.id if top else 0
+                    top_ts = top.date.timestamp() if top and top.date else 0
+
+                    depth = check_depth(stats, limit, top_id)
+                    coverage = "search" if mode == "search" else "full"
+                    scan = None
+                    if not force and can_reuse_result(stats, sig, top_id, depth, coverage):
+                        ok = stats["matched"]  # tidak ada pesan baru & cek terakhir minimal sedalam ini
+                        used["idle"] += 1
+                    else:
+                        how = pick_check_mode(targets, depth, mode)
+                        if how == "search":
+                            ok = await scan_by_search(client, chat.id, targets, depth, top_id=top_id)
+                        else:
+                            ok = await scan_by_history(client, chat.id, targets, depth)
+                        used[how] += 1
+                        scanned = True
+                        scan = {"depth": depth, "coverage": coverage}
+
+                    pending[link_n] = {"stats": next_check_stats(stats, time.time(), sig, top_id, top_ts, ok, scan=scan)}
+                    lines.append(f"{chat.title or link_n}: {'✅ YES' if ok else '❌ NO'}")
+                    if ok: found += 1
+                    processed += 1
+
+            except FloodWait as e:
+                lines.append(f"{link_n}: ⏳ FloodWait {e.value}s (skipped temporarily)")
+                await asyncio.sleep(min(e.value + 5, 60 * 60))
+            except Exception as e:
+                lines.append(f"{link_n}: ⚠️ {e}")
+                processed += 1
+                pending[link_n] = {"stats": next_check_stats(stats, time.time(), sig, error=True)}
 
         if i % STATUS_INTERVAL == 0 or i == total:
+            await state.cache_update_many(pending); pending = {}
             sample = "\n".join(lines[-10:])
-            await update_status(status, f"🔎 Progres cek: {i}/{total}\n✔️ Ketemu: {found}\n📝 Sampel:\n{sample}")
+            await update_status(status, f"🔎 Progres cek: {i}/{total}\n✔️ Ketemu: {found} | ⏭ Dilewati: {len(skipped)}\n📝 Sampel:\n{sample}")
 
-        await human_sleep(2)
+        if due: await human_sleep(2 if scanned else 1)
 
-    head = f"✅ **Selesai!**\nChannel dicek: {processed}\nKetemu: {found}\n\n"
-    await update_status(status, head + ("\n".join(lines[:200]) + (f"\n…({len(lines)-200} lagi)" if len(lines) > 200 else "")))
+    head = (f"✅ **Selesai!**\nChannel dicek: {processed} | Dilewati (jadwal): {len(skipped)}\n"
+            f"Ketemu: {found}" + (f" (+{found_prev} dari hasil terakhir channel yang dilewati)" if found_prev else "") + "\n"
+            f"Mode: search {used['search']} | history {used['history']} | tanpa pesan baru {used['idle']}\n\n")
+    out = lines + skipped
+    await update_status(status, head + ("\n".join(out[:200]) + (f"\n…({len(out)-200} lagi)" if len(out) > 200 else "")))
 
 # ----- helper for /check -----
-async def ensure_join_if_needed(client: Client, link: str, cache: Dict[str, dict]):
-    global adaptive_delay
+def message_matches(m, targets: List[str]) -> bool:
+    all_tlinks = get_all_tme_links(m)
+    for tgt in targets:
+        tgt_low = tgt.lower()
+        if tgt_low.startswith("http"):
+            if any(tgt_low in tl.lower() for tl in all_tlinks): return True
+        else:
+            hay = (m.text or "") + "\n" + (m.caption or "")
+            if tgt_low in hay.lower() or any(tgt_low in tl.lower() for tl in all_tlinks): return True
+    return False
+
+def search_query_for(target: str) -> str:
+    """Query untuk search server-side: username / hash undangan dari link, atau keyword apa adanya."""
+    t = target.strip()
+    if not is_tme_link(t): return t
+    t = normalize_tme_link(t)
+    m = INV_PLUS_RE.match(t) or INV_JOIN_RE.match(t)
+    if m: return m.group(1)
+    return extract_public_username(t) or t
+
+def searchable_target(target: str) -> bool:
+    """Keyword / @username muncul di teks yang diindeks search; link t.me bisa saja hanya ada di tombol/text-link."""
+    return not is_tme_link(target.strip())
+
+def pick_check_mode(targets: List[str], limit: int, mode: str = "auto") -> str:
+    """auto hanya memilih search bila semua target pasti bisa ditemukan lewat search; sisanya history."""
+    if mode in ("search", "history"): return mode
+    if len(targets) <= SEARCH_MAX_TARGETS and limit >= SEARCH_MIN_LIMIT and all(searchable_target(t) for t in targets):
+        return "search"
+    return "history"
+
+async def scan_by_history(client: Client, chat_id: int, targets: List[str], limit: int) -> bool:
+    async for m in client.get_chat_history(chat_id, limit=limit):
+        if message_matches(m, targets): return True
+    return False
+
+async def scan_by_search(client: Client, chat_id: int, targets: List[str], limit: int,
+                         top_id: Optional[int] = None) -> bool:
+    """
+    Satu search_messages per target, hit dikonfirmasi lokal via message_matches.
+    Kedalaman dibatasi dengan id: hanya pesan dalam ~`limit` id terakhir (setara limit history).
+    Catatan: link yang hanya ada di tombol/text-link tidak selalu terindeks search,
+    karena itu auto hanya memakai search untuk target keyword/@username (lihat pick_check_mode).
+    """
+    if top_id is None:
+        top = await latest_message(client, chat_id)
+        top_id = top.id if top else 0
+    if not top_id: return False
+    floor_id = top_id - limit
+    for tgt in targets:
+        query = search_query_for(tgt)
+        if not query: continue
+        async for m in client.search_messages(chat_id, query=query, limit=limit):
+            if m.id <= floor_id: break  # hasil urut terbaru dulu
+            if message_matches(m, [tgt]): return True
+    return False
+
+async def latest_message(client: Client, chat_id: int):
+    async for m in client.get_chat_history(chat_id, limit=1):
+        return m
+    return None
+
+# --- penjadwalan adaptif per channel (stats disimpan di cache[link]["stats"]) ---
+def targets_sig(targets: List[str]) -> str:
+    """Hasil cek lama hanya berlaku untuk daftar target yang sama."""
+    return format(zlib.crc32("\n".join(sorted(targets)).encode("utf-8")), "08x")
+
+def _backoff(n: int) -> float:
+    return min(CHECK_BASE_INTERVAL * 2 ** max(n - 1, 0), CHECK_MAX_INTERVAL)
+
+def check_interval(st: dict, now: float) -> float:
+    """
+    Jeda sampai cek berikutnya:
+    - tiap run terjadwal beruntun tanpa pesan baru (idle) menggandakan jeda
+    - makin lama sejak pesan baru terakhir (last_new_at), makin panjang: 1/4 umur sepinya,
+      tapi paling jauh satu langkah backoff berikutnya (naik bertahap, tidak langsung ke maks)
+    - channel aktif (rate tinggi) atau yang baru match (last_match_at) tidak di-backoff lebih dari
+      CHECK_BASE_INTERVAL
+    """
+    if not st.get("idle"): return 0
+    interval = _backoff(st["idle"])
+    if st.get("last_new_at"):
+        interval = max(interval, min((now - st["last_new_at"]) / 4, _backoff(st["idle"] + 1)))
+    if st.get("rate", 0) >= CHECK_ACTIVE_RATE or now - st.get("last_match_at", 0) <= CHECK_MATCH_GRACE:
+        interval = min(interval, CHECK_BASE_INTERVAL)
+    return min(interval, CHECK_MAX_INTERVAL)
+
+def check_due(stats: Optional[dict], sig: str, now: float) -> Tuple[bool, str]:
+    if not stats or stats.get("sig") != sig: return True, ""
+    next_at = stats.get("next_at", 0)
+    if now >= next_at: return True, ""
+    wait = fmt_dur(next_at - now)
+    if stats.get("errors"): return False, f"error {stats['errors']}x beruntun, backoff {wait}"
+    return False, f"sepi {stats.get('idle', 0)}x, cek lagi {wait}"
+
+def check_depth(stats: Optional[dict], limit: int, top_id: int) -> int:
+    """Channel aktif dicek lebih dalam: minimal semua pesan baru sejak cek terakhir (maks 1000)."""
+    prev = (stats or {}).get("top_id")
+    if prev is None: return limit
+    return max(limit, min(1000, top_id - prev))
+
+def can_reuse_result(stats: Optional[dict], sig: str, top_id: int, depth: int, coverage: str) -> bool:
+    """
+    Hasil lama boleh dipakai ulang hanya bila tidak ada pesan baru, target sama,
+    dan scan lama minimal sedalam permintaan sekarang (search-only tidak menggantikan scan penuh).
+    """
+    if not stats or "matched" not in stats: return False
+    if stats.get("sig") != sig or stats.get("top_id") != top_id: return False
+    if stats.get("depth", 0) < depth: return False
+    return stats.get("coverage") == "full" or coverage == "search"
+
+def next_check_stats(old: Optional[dict], now: float, sig: str, top_id: int = 0, top_ts: float = 0,
+                     matched: Optional[bool] = None, error: bool = False, scan: Optional[dict] = None) -> dict:
+    """
+    Update stats channel setelah cek:
+    - rate: pesan/jam (EWMA) dari selisih id sejak cek terakhir
+    - idle: berapa kali beruntun tanpa pesan baru -> backoff eksponensial
+    - errors: error beruntun -> backoff eksponensial
+    idle/errors hanya naik bila jadwal sebelumnya (next_at) memang sudah lewat; run force/lebih awal
+    tidak menggandakan backoff tanpa jeda nyata.
+    - matched/last_match_at: hasil cek terakhir
+    - depth/coverage: seberapa dalam scan yang menghasilkan `matched` (None = hasil dipakai ulang)
+    """
+    st = dict(old or {})
+    st["sig"] = sig
+    on_schedule = now >= st.get("next_at", 0)
+    if error:
+        if on_schedule or not st.get("errors"):
+            st["errors"] = st.get("errors", 0) + 1
+        st["next_at"] = now + _backoff(st["errors"])
+        return st
+
+    prev_top, prev_at = st.get("top_id"), st.get("checked_at")
+    new_msgs = max(0, top_id - prev_top) if prev_top is not None else 0
+    if prev_top is not None and prev_at and now > prev_at:
+        rate = new_msgs / ((now - prev_at) / 3600)
+        st["rate"] = round(0.5 * st.get("rate", rate) + 0.5 * rate, 3)
+    if new_msgs or prev_top is None:
+        st["idle"] = 0
+        if top_ts: st["last_new_at"] = top_ts
+    elif on_schedule:
+        st["idle"] = st.get("idle", 0) + 1
+    st["errors"] = 0
+    st["top_id"] = top_id
+    st["checked_at"] = now
+    if scan: st.update(scan)
+    if matched is not None:
+        st["matched"] = matched
+        if matched: st["last_match_at"] = now
+    st["next_at"] = now + check_interval(st, now)
+    return st
+
+async def ensure_join_if_needed(client: Client, link: str):
     link_n = normalize_tme_link(link)
     if not is_invite_link(link_n): return
-    ok_quota, _ = quota_allows_join()
-    if not ok_quota: return
-    try:
-        chat = await client.join_chat(link_n)
-        cache[link_n] = {"chat_id": chat.id, "title": chat.title or ""}
-        save_cache(cache)
-        join_timestamps.append(time.time())
-        adaptive_delay = min(max(adaptive_delay, JOIN_DELAY) + 1, 20)
-    except UserAlreadyParticipant:
+    flood_wait = 0
+    async with state.key_lock(link_n):
+        ts, _ = state.reserve_join()
+        if ts is None: return
         try:
-            ch = await client.get_chat(link_n)
-            cache[link_n] = {"chat_id": ch.id, "title": ch.title or ""}
-            save_cache(cache)
+            chat = await client.join_chat(link_n)
+            await state.cache_update(link_n, chat_id=chat.id, title=chat.title or "")
+            state.step_delay()
+        except UserAlreadyParticipant:
+            state.release_join(ts)
+            try:
+                ch = await client.get_chat(link_n)
+                await state.cache_update(link_n, chat_id=ch.id, title=ch.title or "")
+            except Exception:
+                pass
+        except FloodWait as e:
+            state.release_join(ts)
+            note_flood(e.value)
+            if e.value >= 300: state.raise_delay(15)
+            if e.value >= 1200: state.raise_delay(20)
+            flood_wait = e.value
         except Exception:
-            pass
-    except FloodWait as e:
-        if e.value >= 300: adaptive_delay = max(adaptive_delay, 15)
-        if e.value >= 1200: adaptive_delay = max(adaptive_delay, 20)
-        await asyncio.sleep(min(e.value + 10, 60 * 60))
-    except Exception:
-        pass
+            state.release_join(ts)
+    # tidur di luar lock supaya command lain yang menyentuh link ini tidak ikut tertahan
+    if flood_wait:
+        await asyncio.sleep(min(flood_wait + 10, 60 * 60))
 
 # ==================== STARTUP ====================
 if __name__ == "__main__":